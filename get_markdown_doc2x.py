@@ -1,8 +1,10 @@
 import json
+import random
 import time
 import requests as rq
 import os
 from dotenv import load_dotenv
+from ocr_cache import ocr_cache
 
 load_dotenv()
 
@@ -27,41 +29,63 @@ def put_file(path: str, url: str):
         res.raise_for_status()  # Check if HTTP request is successful
 
 
-def get_status(uid: str):
+def get_status(uid: str, max_retries: int = 5):
     url = f"{base_url}/api/v2/parse/status?uid={uid}"
     headers = {"Authorization": f"Bearer {secret}"}
-    res = rq.get(url, headers=headers)
-    res.raise_for_status()  # Check if HTTP request is successful
+    # Retry transient HTTP errors with backoff + jitter so a 5xx/timeout
+    # doesn't abort a job that is still processing server-side
+    for attempt in range(1, max_retries + 1):
+        try:
+            res = rq.get(url, headers=headers)
+            res.raise_for_status()  # Check if HTTP request is successful
+            break
+        except rq.exceptions.RequestException as e:
+            if attempt == max_retries:
+                raise
+            delay = min(30, 2**attempt + random.uniform(0, 1))
+            print(f"get status failed ({e}), retrying in {delay:.1f}s")
+            time.sleep(delay)
     data = res.json()
     if data.get("code") == "success":
         return data["data"]
     raise Exception(f"get status failed: {data}")
 
 
-def convert_to_markdown(file):
+@ocr_cache(model="doc2x")
+def convert_to_markdown(file, result_path="result.json"):
     upload_data = preupload()
     print(upload_data)
     url, uid = upload_data["url"], upload_data["uid"]
 
     put_file(file, url)
 
-    max_retries = 1000
-    for _ in range(max_retries):
+    max_polls = 1000
+    attempt = 0
+    last_progress = None
+    for _ in range(max_polls):
         status_data = get_status(uid)
         status = status_data.get("status")
         if status == "success":
-            print("Save result to result.json")
-            with open("result.json", "w") as f:
+            print(f"Save result to {result_path}")
+            with open(result_path, "w") as f:
                 json.dump(status_data["result"], f)
-            return
+            return result_path
         elif status == "failed":
             print(status_data)
             raise Exception(f"parse failed: {status_data.get('detail')}")
         elif status == "processing":
-            print(status_data)
-            print(f"progress: {status_data.get('progress')}")
-            time.sleep(3)
-    raise Exception(f"Fails to deal with uid: {uid} after {max_retries} retries")
+            progress = status_data.get("progress")
+            print(f"progress: {progress}")
+            if progress != last_progress:
+                # Job is advancing - don't let the delay climb to the cap
+                attempt = 0
+                last_progress = progress
+            # Exponential backoff with jitter, capped at 60s, instead of
+            # hammering the status endpoint every 3 seconds
+            delay = min(60, 2 ** min(attempt, 6) + random.uniform(0, 1))
+            attempt += 1
+            time.sleep(delay)
+    raise Exception(f"Fails to deal with uid: {uid} after {max_polls} polls")
 
 
 if __name__ == "__main__":
@@ -2,6 +2,7 @@ import os
 from mistralai import Mistral
 import dotenv
 import json
+from ocr_cache import ocr_cache
 
 
 dotenv.load_dotenv()
@@ -9,7 +10,8 @@ dotenv.load_dotenv()
 mistral_api_key = os.environ["MISTRAL_API_KEY"]
 
 
-def convert_to_markdown(pdf_filename):
+@ocr_cache(model="mistral-ocr-latest", include_image_base64=True)
+def convert_to_markdown(pdf_filename, result_path="result.json"):
     client = Mistral(api_key=mistral_api_key)
     uploaded_pdf = client.files.upload(
         file={
@@ -31,8 +33,9 @@ def convert_to_markdown(pdf_filename):
     )
 
     content = json.loads(ocr_response.model_dump_json())
-    with open("result.json", "w") as f:
+    with open(result_path, "w") as f:
         json.dump(content, f)
+    return result_path
 
 
 if __name__ == "__main__":
@@ -1,6 +1,17 @@
+import asyncio
+import functools
+import hashlib
+import json
+import random
+import shutil
+import threading
 import requests
+import aiohttp
+import aiofiles
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import os
 from logger_config import get_logger
 import time
@@ -8,9 +19,83 @@ import time
 # Get logger
 logger = get_logger(__name__)
 
+# Shared session so the HTML fetch, PDF fetch and retries reuse warm
+# TCP/TLS connections instead of handshaking per request
+_SESSION = requests.Session()
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=8,
+        pool_maxsize=16,
+        max_retries=Retry(
+            total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504]
+        ),
+    ),
+)
+
+
+# Content-addressed cache of downloaded PDFs keyed by sha256(url), so
+# retries and re-runs don't re-download identical content
+PDF_CACHE_DIR = os.path.join("cache", "pdfs")
+
+
+def _pdf_cache_path(pdf_url):
+    digest = hashlib.sha256(pdf_url.encode("utf-8")).hexdigest()
+    return os.path.join(PDF_CACHE_DIR, digest[:2], f"{digest}.pdf")
+
+
+def _link_or_copy(src, dst):
+    """Hardlink src to dst, copying when hardlinks aren't possible"""
+    if os.path.abspath(src) == os.path.abspath(dst):
+        return
+    if os.path.exists(dst):
+        os.remove(dst)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _pdf_cache_hit(pdf_url, output_path):
+    """Materialize a cached PDF at output_path; returns True on cache hit"""
+    cache_path = _pdf_cache_path(pdf_url)
+    if os.path.exists(cache_path) and os.path.getsize(cache_path) > 0:
+        _link_or_copy(cache_path, output_path)
+        logger.info(f"Using cached PDF for: {pdf_url}")
+        return True
+    return False
+
+
+def _pdf_cache_store(pdf_url, file_path, headers=None):
+    """Atomically store a downloaded PDF (plus validator sidecar) in the cache"""
+    try:
+        cache_path = _pdf_cache_path(pdf_url)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        shutil.copy2(file_path, tmp_path)
+        os.replace(tmp_path, cache_path)
+
+        # Sidecar with HTTP validators so conditional re-fetches can use
+        # If-None-Match / If-Modified-Since and accept 304 responses
+        meta = {
+            "etag": headers.get("ETag") if headers else None,
+            "last_modified": headers.get("Last-Modified") if headers else None,
+            "size": os.path.getsize(cache_path),
+        }
+        with open(f"{cache_path}.meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+    except OSError as e:
+        logger.warning(f"Failed to cache PDF {pdf_url}: {e}")
+
 
+@functools.lru_cache(maxsize=1)
 def get_proxies():
-    """Get proxy settings from environment variables"""
+    """Get proxy settings from environment variables
+
+    The environment doesn't change within one run, so the lookup (and
+    its log line) only happens once instead of on every request/retry.
+    Call refresh_proxies() if the environment was modified.
+    """
     proxies = {}
     if os.environ.get("HTTP_PROXY"):
         proxies["http"] = os.environ.get("HTTP_PROXY")
@@ -34,50 +119,40 @@ def get_proxies():
     return proxies or None
 
 
-def extract_pdf_link(html_content):
-    soup = BeautifulSoup(html_content, "html.parser")
+def refresh_proxies():
+    """Drop the cached proxy settings so the next call re-reads the environment"""
+    get_proxies.cache_clear()
 
-    # Method 1: Find links with PDF badge
-    pdf_badges = soup.find_all("a", class_="badge badge-light")
-    for badge in pdf_badges:
-        if badge.find("span", string="PDF"):
-            return badge.get("href")
 
-    # Method 2: Find all links containing .pdf
-    all_links = soup.find_all("a")
-    pdf_links = [
-        link.get("href")
-        for link in all_links
-        if link.get("href") and ".pdf" in link.get("href")
-    ]
-    if pdf_links:
-        return pdf_links[0]
+def extract_links(html_content):
+    """Extract the PDF and arXiv links from a paper page in one lxml parse
 
-    return None
+    Accepts a str, bytes, or file-like object (BeautifulSoup reads all
+    three), so callers can feed the raw response stream without first
+    materializing the whole page as a Python string.
+    """
+    soup = BeautifulSoup(html_content, "lxml")
 
+    # PDF badge first, generic .pdf link as fallback
+    pdf_badge = soup.select_one('a.badge.badge-light:has(span:-soup-contains("PDF"))')
+    pdf_link = pdf_badge.get("href") if pdf_badge else None
+    if not pdf_link:
+        generic = soup.select_one('a[href*=".pdf"]')
+        pdf_link = generic.get("href") if generic else None
 
-def extract_arxiv_link(html_content):
-    """Extract arXiv link from a Papers with Code paper page"""
-    soup = BeautifulSoup(html_content, "html.parser")
+    arxiv = soup.select_one('a[href*="arxiv.org"]')
+    arxiv_link = arxiv.get("href") if arxiv else None
 
-    # Find links to arXiv
-    arxiv_links = []
+    return {"pdf_link": pdf_link, "arxiv_link": arxiv_link}
 
-    # Method 1: Look for arXiv badge
-    arxiv_badges = soup.find_all("a", class_="badge badge-light")
-    for badge in arxiv_badges:
-        href = badge.get("href", "")
-        if "arxiv.org" in href:
-            return href
 
-    # Method 2: Check all external links
-    for link in soup.find_all("a"):
-        href = link.get("href", "")
-        if "arxiv.org" in href:
-            arxiv_links.append(href)
+def extract_pdf_link(html_content):
+    return extract_links(html_content)["pdf_link"]
 
-    # Return the first arXiv link if found
-    return arxiv_links[0] if arxiv_links else None
+
+def extract_arxiv_link(html_content):
+    """Extract arXiv link from a Papers with Code paper page"""
+    return extract_links(html_content)["arxiv_link"]
 
 
 def get_pdf_url(url, timeout=10):
@@ -87,12 +162,15 @@ def get_pdf_url(url, timeout=10):
 
         # Send request to get page content with proxies
         logger.info(f"Fetching URL: {url}")
-        response = requests.get(url, proxies=proxies, timeout=timeout)
+        response = _SESSION.get(url, proxies=proxies, timeout=timeout, stream=True)
         response.raise_for_status()
 
-        # Parse PDF link and arXiv link
-        pdf_url = extract_pdf_link(response.text)
-        arxiv_url = extract_arxiv_link(response.text)
+        # Feed the raw stream straight into the parser instead of
+        # buffering the whole page as a str via response.text
+        response.raw.decode_content = True
+        links = extract_links(response.raw)
+        pdf_url = links["pdf_link"]
+        arxiv_url = links["arxiv_link"]
 
         result = {
             "pdf_url": urljoin(url, pdf_url) if pdf_url else None,
@@ -121,6 +199,15 @@ def download_pdf(url, output_file_dir="./", max_retries=3, timeout=30):
     if not pdf_url:
         return None, arxiv_url
 
+    # Extract original filename from URL
+    filename = pdf_url.split("/")[-1]
+    if not filename.endswith(".pdf"):
+        filename = "paper.pdf"  # fallback to default name if no PDF extension
+    output_path = os.path.join(output_file_dir, filename)
+
+    if _pdf_cache_hit(pdf_url, output_path):
+        return filename, arxiv_url
+
     # Try with and without proxy if needed
     for attempt in range(1, max_retries + 1):
         try:
@@ -134,43 +221,47 @@ def download_pdf(url, output_file_dir="./", max_retries=3, timeout=30):
             )
 
             # Stream the response to avoid loading the entire file into memory
-            with requests.get(
+            with _SESSION.get(
                 pdf_url, proxies=proxies, timeout=timeout, stream=True
             ) as response:
                 response.raise_for_status()
 
-                # Extract original filename from URL
-                filename = pdf_url.split("/")[-1]
-                if not filename.endswith(".pdf"):
-                    filename = (
-                        "paper.pdf"  # fallback to default name if no PDF extension
-                    )
-
                 # Save PDF with original filename
                 total_size_in_bytes = int(response.headers.get("content-length", 0))
-                block_size = 8192  # 8 Kilobytes
-                downloaded = 0
+                block_size = 1 << 20  # 1 MiB - far fewer Python-level chunks
 
-                with open(os.path.join(output_file_dir, filename), "wb") as f:
+                with open(output_path, "wb") as f:
                     start_time = time.time()
-                    for chunk in response.iter_content(chunk_size=block_size):
-                        if chunk:  # filter out keep-alive new chunks
-                            f.write(chunk)
-                            downloaded += len(chunk)
-
-                            # Log progress for large files
-                            if (
-                                total_size_in_bytes > 0
-                                and downloaded % (5 * block_size) == 0
-                            ):
+                    done = threading.Event()
+
+                    def log_progress():
+                        # Poll f.tell() on a timer instead of doing
+                        # per-chunk progress math in the copy loop
+                        while not done.wait(1.0):
+                            downloaded = f.tell()
+                            elapsed = time.time() - start_time
+                            if total_size_in_bytes > 0 and elapsed > 0:
                                 progress = (downloaded / total_size_in_bytes) * 100
-                                elapsed = time.time() - start_time
-                                if elapsed > 0:
-                                    speed = downloaded / (1024 * elapsed)
-                                    logger.info(
-                                        f"Download progress: {progress:.1f}% - {speed:.1f} KB/s"
-                                    )
-
+                                speed = downloaded / (1024 * elapsed)
+                                # Lazy formatting: the strings are only built
+                                # when a sink actually accepts DEBUG records
+                                logger.opt(lazy=True).debug(
+                                    "Download progress: {}% - {} KB/s",
+                                    lambda progress=progress: f"{progress:.1f}",
+                                    lambda speed=speed: f"{speed:.1f}",
+                                )
+
+                    reporter = threading.Thread(target=log_progress, daemon=True)
+                    reporter.start()
+                    try:
+                        # Offload the copy loop to shutil with a large buffer
+                        response.raw.decode_content = True
+                        shutil.copyfileobj(response.raw, f, length=block_size)
+                    finally:
+                        done.set()
+                        reporter.join()
+
+                _pdf_cache_store(pdf_url, output_path, response.headers)
                 logger.info(f"Successfully downloaded paper as {filename}")
                 return filename, arxiv_url
 
@@ -193,6 +284,213 @@ def download_pdf(url, output_file_dir="./", max_retries=3, timeout=30):
     return None, arxiv_url
 
 
+def _get_async_proxy():
+    """Pick a single proxy URL for aiohttp (which takes one proxy per request)"""
+    proxies = get_proxies()
+    if not proxies:
+        return None
+    return proxies.get("https") or proxies.get("http")
+
+
+async def get_pdf_url_async(session, url, timeout=10):
+    """Async variant of get_pdf_url sharing one aiohttp session across papers"""
+    proxy = _get_async_proxy()
+    try:
+        logger.info(f"Fetching URL: {url}")
+        async with session.get(
+            url, proxy=proxy, timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            response.raise_for_status()
+            # Raw bytes - skip the intermediate decoded str copy and let
+            # lxml handle the encoding itself
+            html = await response.read()
+
+        links = extract_links(html)
+        pdf_url = links["pdf_link"]
+        arxiv_url = links["arxiv_link"]
+
+        result = {
+            "pdf_url": urljoin(url, pdf_url) if pdf_url else None,
+            "arxiv_url": arxiv_url,
+        }
+
+        if not result["pdf_url"]:
+            logger.warning("No PDF link found")
+
+        return result
+
+    except asyncio.TimeoutError:
+        logger.error(f"Timeout while fetching the page (after {timeout}s)")
+        return {"pdf_url": None, "arxiv_url": None}
+    except aiohttp.ClientError as e:
+        logger.error(f"Error fetching the page: {e}")
+        return {"pdf_url": None, "arxiv_url": None}
+
+
+async def _fetch_range(session, url, fd, start, end, proxy, timeout, max_retries=3):
+    """Fetch one byte range into the preallocated file, with backoff + jitter"""
+    headers = {"Range": f"bytes={start}-{end}"}
+    for attempt in range(1, max_retries + 1):
+        try:
+            async with session.get(
+                url,
+                headers=headers,
+                proxy=proxy,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+            ) as response:
+                response.raise_for_status()
+                if response.status != 206:
+                    # Server (or a redirect target) ignored the Range
+                    # header; pwrite-ing a full 200 body at this chunk's
+                    # offset would scramble the file
+                    raise aiohttp.ClientResponseError(
+                        response.request_info,
+                        response.history,
+                        status=response.status,
+                        message="expected 206 Partial Content",
+                    )
+                offset = start
+                async for chunk in response.content.iter_chunked(65536):
+                    os.pwrite(fd, chunk, offset)
+                    offset += len(chunk)
+            return
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == max_retries:
+                raise
+            delay = min(30, 2**attempt + random.uniform(0, 1))
+            logger.warning(
+                f"Range {start}-{end} failed ({e}), retrying in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+
+
+async def download_pdf_ranged(
+    session, pdf_url, path, chunk_size=2 * 1024 * 1024, max_conns=10, timeout=60
+):
+    """Download a PDF by fetching byte ranges concurrently into one file
+
+    Probes the server with a HEAD request first; returns False when range
+    requests aren't supported (or the file is too small to be worth
+    splitting) so the caller can fall back to the single-stream path.
+    """
+    proxy = _get_async_proxy()
+    try:
+        async with session.head(
+            pdf_url,
+            proxy=proxy,
+            allow_redirects=True,
+            timeout=aiohttp.ClientTimeout(total=10),
+        ) as response:
+            response.raise_for_status()
+            size = int(response.headers.get("Content-Length", 0))
+            accept_ranges = response.headers.get("Accept-Ranges", "").lower()
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        logger.warning(f"HEAD request failed for {pdf_url}: {e}")
+        return False
+
+    if accept_ranges != "bytes" or size < 2 * chunk_size:
+        return False
+
+    logger.info(f"Downloading {size} bytes in ranged chunks from: {pdf_url}")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    try:
+        # Preallocate so concurrent pwrite calls land in disjoint regions
+        try:
+            os.posix_fallocate(fd, 0, size)
+        except (AttributeError, OSError):
+            os.ftruncate(fd, size)
+
+        sem = asyncio.Semaphore(max_conns)
+
+        async def fetch(start, end):
+            async with sem:
+                await _fetch_range(session, pdf_url, fd, start, end, proxy, timeout)
+
+        ranges = [
+            (start, min(start + chunk_size, size) - 1)
+            for start in range(0, size, chunk_size)
+        ]
+        tasks = [asyncio.create_task(fetch(start, end)) for start, end in ranges]
+        try:
+            await asyncio.gather(*tasks)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Ranged download failed: {e}")
+            # Stop the sibling ranges before the descriptor goes away: a
+            # late pwrite on a closed (and possibly reused) fd number
+            # would land range data in whatever file inherits it
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            os.close(fd)
+            fd = None
+            os.remove(path)
+            return False
+        return True
+    finally:
+        if fd is not None:
+            os.close(fd)
+
+
+async def download_pdf_async(session, url, output_file_dir="./", sem=None, timeout=60):
+    """Download the PDF behind a paper page without blocking the event loop
+
+    Concurrency is bounded by the semaphore so a batch of papers doesn't
+    open an unbounded number of connections at once.
+    Returns (filename, arxiv_url) just like download_pdf.
+    """
+    if sem is None:
+        sem = asyncio.Semaphore(4)
+
+    async with sem:
+        result = await get_pdf_url_async(session, url)
+        pdf_url = result["pdf_url"]
+        arxiv_url = result["arxiv_url"]
+
+        if not pdf_url:
+            return None, arxiv_url
+
+        # Extract original filename from URL
+        filename = pdf_url.split("/")[-1]
+        if not filename.endswith(".pdf"):
+            filename = "paper.pdf"  # fallback to default name if no PDF extension
+        output_path = os.path.join(output_file_dir, filename)
+
+        if _pdf_cache_hit(pdf_url, output_path):
+            return filename, arxiv_url
+
+        proxy = _get_async_proxy()
+        try:
+            # Try parallel range requests first; large files download
+            # several ranges at once instead of one TCP stream
+            if await download_pdf_ranged(session, pdf_url, output_path):
+                _pdf_cache_store(pdf_url, output_path)
+                logger.info(f"Successfully downloaded paper as {filename}")
+                return filename, arxiv_url
+
+            logger.info(f"Downloading PDF from: {pdf_url}")
+            async with session.get(
+                pdf_url, proxy=proxy, timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                response.raise_for_status()
+
+                # Stream chunks straight to disk via aiofiles
+                async with aiofiles.open(output_path, "wb") as f:
+                    async for chunk in response.content.iter_chunked(65536):
+                        await f.write(chunk)
+
+                _pdf_cache_store(pdf_url, output_path, response.headers)
+
+            logger.info(f"Successfully downloaded paper as {filename}")
+            return filename, arxiv_url
+
+        except asyncio.TimeoutError:
+            logger.error(f"Timeout while downloading PDF (after {timeout}s)")
+            return None, arxiv_url
+        except aiohttp.ClientError as e:
+            logger.error(f"Error downloading PDF: {e}")
+            return None, arxiv_url
+
+
 # Usage example
 if __name__ == "__main__":
     url = "https://paperswithcode.com/paper/interactive-gadolinium-free-mri-synthesis-a"
@@ -18,6 +18,7 @@ logger.add(
     level="INFO",
     format="{time:YYYY-MM-DD HH:mm:ss} - {name}:{function}:{line} - {level} - {message}",
     encoding="utf-8",
+    enqueue=True,  # Write on a background thread so logging never blocks hot loops
 )
 
 # Add console log handler
@@ -25,6 +26,7 @@ logger.add(
     sys.stdout,
     level="INFO",
     format="{time:YYYY-MM-DD HH:mm:ss} - {name}:{function}:{line} - {level} - {message}",
+    enqueue=True,
 )
 
 # Other optional configurations
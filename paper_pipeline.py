@@ -1,9 +1,30 @@
 import os
-import json
+import re
+import base64
+import functools
+import shutil
+import hashlib
+import asyncio
+import time
+import threading
+import ijson
+import orjson
 import yaml
+import aiohttp
 from datetime import datetime
 from contextlib import contextmanager
-from sqlalchemy import create_engine
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import (
+    create_engine,
+    event,
+    update,
+    exists,
+    select,
+    func,
+    Column,
+    String,
+    Float,
+)
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 from logger_config import get_logger
@@ -13,11 +34,12 @@ from sm_ms_uploader import SMmsUploader
 from papers_with_code import (
     Base,
     Paper,
+    ensure_schema,
     scrape_papers_with_pagination,
     save_papers_to_db,
 )
 from ranking import get_random_papers, get_chatgpt_ranking, create_prompt
-from get_pdf import download_pdf
+from get_pdf import download_pdf, download_pdf_async
 from get_markdown_doc2x import convert_to_markdown as convert_to_markdown_doc2x
 from get_markdown_mistral import convert_to_markdown as convert_to_markdown_mistral
 from summarize_paper import summarize_paper
@@ -26,11 +48,19 @@ from summarize_paper import summarize_paper
 logger = get_logger(__name__)
 
 
+@functools.lru_cache(maxsize=1)
 def load_config():
-    """Load configuration from config.yaml or use defaults if not available"""
+    """Load configuration from config.yaml or use defaults if not available
+
+    Cached: the file is parsed once per process, so other modules can call
+    this freely instead of importing the config global.
+    """
     try:
         with open("config.yaml", "r") as config_file:
-            return yaml.safe_load(config_file)
+            # The C-accelerated loader when libyaml is available; plain
+            # SafeLoader is a pure-Python fallback an order of magnitude slower
+            loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+            return yaml.load(config_file, Loader=loader)
     except Exception as e:
         logger.error(f"Error loading config.yaml: {str(e)}")
         return {
@@ -44,6 +74,61 @@ def load_config():
 # Global config
 config = load_config()
 
+# Bump when the summarization prompt/config changes so stale cached
+# summaries are not reused
+SUMMARIZER_VERSION = "v1"
+
+
+class SummaryCache(Base):
+    """Cached LLM summaries keyed by content hash + summarizer version"""
+
+    __tablename__ = "summary_cache"
+
+    hash = Column(String, primary_key=True)
+    summary = Column(String)
+    created_at = Column(Float)
+
+
+class ImageUpload(Base):
+    """Uploaded image URLs keyed by content hash, so identical images
+    (the same figure re-OCRed across runs) are never uploaded twice"""
+
+    __tablename__ = "image_uploads"
+
+    hash = Column(String, primary_key=True)
+    url = Column(String)
+    created_at = Column(Float)
+
+
+# One engine + session factory for the whole process: engine construction
+# and the create_all schema check involve round-trips against SQLite, so
+# don't redo them on every session_scope entry. check_same_thread is off
+# because pipeline stage workers run on threads.
+_engine = create_engine(
+    "sqlite:///papers.db", connect_args={"check_same_thread": False}
+)
+
+
+@event.listens_for(_engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Apply tuning pragmas on every new pooled connection
+
+    Most pragmas are per-connection in SQLite, so a one-shot statement
+    after engine creation only covers the first connection; the connect
+    event covers every one the pool opens.
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-20000")  # ~20MB page cache
+    cursor.close()
+
+
+Base.metadata.create_all(_engine)
+ensure_schema(_engine)
+_SessionFactory = sessionmaker(bind=_engine)
+
 
 class PaperInfo:
     """Data class to store paper information"""
@@ -63,10 +148,7 @@ class PaperInfo:
 @contextmanager
 def session_scope():
     """Creates a context manager for database sessions to ensure proper handling"""
-    engine = create_engine("sqlite:///papers.db")
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    session = _SessionFactory()
     try:
         yield session
         session.commit()
@@ -79,10 +161,7 @@ def session_scope():
 
 def setup_database():
     """Set up and return a database session (legacy function, use session_scope instead)"""
-    engine = create_engine("sqlite:///papers.db")
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return _SessionFactory()
 
 
 def fetch_latest_papers(limit=100):
@@ -95,7 +174,7 @@ def fetch_latest_papers(limit=100):
         new_count, updated_count = save_papers_to_db(papers, session)
         logger.info(f"New papers added: {new_count}")
         logger.info(f"Papers updated: {updated_count}")
-        total_count = session.query(Paper).count()
+        total_count = session.scalar(select(func.count()).select_from(Paper))
         logger.info(f"Total papers in database: {total_count}")
 
     return new_count + updated_count
@@ -121,11 +200,30 @@ def rank_and_select_papers(limit=3):
         # Process only valid paper IDs up to the limit
         valid_ids = [pid for pid in ranked_paper_ids if isinstance(pid, int)][:limit]
 
+        # Fetch all selected rows in one round-trip, reindexed by id so
+        # the ranking order is preserved. This is read-only, so a plain
+        # column select skips ORM object construction and identity-map
+        # bookkeeping; writes below still go through the ORM table.
+        papers_by_id = {
+            row.id: row
+            for row in session.execute(
+                select(
+                    Paper.id,
+                    Paper.title,
+                    Paper.github_link,
+                    Paper.paper_link,
+                    Paper.code_link,
+                    Paper.stars,
+                    Paper.arxiv_link,
+                ).where(Paper.id.in_(valid_ids))
+            ).all()
+        }
+
         top_papers = []
         logger.info("Top recommended papers:")
 
         for rank, paper_id in enumerate(valid_ids, 1):
-            paper = session.query(Paper).filter_by(id=paper_id).first()
+            paper = papers_by_id.get(paper_id)
             if paper:
                 paper_info = PaperInfo(
                     id=paper.id,
@@ -142,51 +240,172 @@ def rank_and_select_papers(limit=3):
                 logger.info(f"   GitHub: {paper.github_link}")
                 logger.info(f"   Paper: {paper.arxiv_link or paper.paper_link}\n")
 
-                # Mark paper as read
-                paper.thoroughly_read = True
+        # Mark all selected papers as read with a single UPDATE statement
+        if top_papers:
+            session.execute(
+                update(Paper)
+                .where(Paper.id.in_([p.id for p in top_papers]))
+                .values(thoroughly_read=True)
+            )
 
     return top_papers
 
 
-def get_latest_pdf():
-    """Helper function to get the most recently downloaded PDF file"""
-    pdf_files = [f for f in os.listdir(".") if f.endswith(".pdf")]
-    if not pdf_files:
-        return None
-    return sorted(pdf_files, key=lambda x: os.path.getmtime(x), reverse=True)[0]
+class _TokenBucket:
+    """Tiny token bucket so concurrent uploads stay under the API rate limit"""
 
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
 
-def process_paper(paper_info):
-    """Process a single paper: download PDF, convert to Markdown, summarize and handle images"""
-    logger.info(f"Starting to process paper: {paper_info.title}")
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def _image_hash(path):
+    """Content hash of an image file - blake2b is faster than sha256 for
+    this and 128 bits is plenty for dedup keys"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def upload_images(smms_uploader, image_paths, max_workers=8):
+    """Upload images to SM.MS concurrently; returns {local_path: online_url}
+
+    Uploads are network round-trips, so overlapping them in a small
+    thread pool collapses N serial RTTs into ceil(N/workers) batches;
+    the token bucket keeps the request rate under SM.MS's limits.
+    Content hashes already recorded in the image_uploads table resolve
+    to their stored URL without touching the network.
+    """
+    url_map = {}
+
+    # Check the dedup table first: one IN query covers the whole batch
+    hashes = {path: _image_hash(path) for path in image_paths}
+    with session_scope() as session:
+        known = {
+            row.hash: row.url
+            for row in session.query(ImageUpload)
+            .filter(ImageUpload.hash.in_(set(hashes.values())))
+            .all()
+        }
+    pending = []
+    for path, content_hash in hashes.items():
+        if content_hash in known:
+            url_map[path] = known[content_hash]
+            logger.info(f"Image already uploaded, reusing URL: {known[content_hash]}")
+        else:
+            pending.append(path)
 
-    # Use arXiv link if available, otherwise use paper_link
-    paper_url = (
-        paper_info.arxiv_link if paper_info.arxiv_link else paper_info.paper_link
-    )
+    if not pending:
+        return url_map
 
-    if not paper_url:
-        logger.error("Paper has no available PDF link")
+    bucket = _TokenBucket(rate=4, burst=4)
+
+    def upload(path):
+        bucket.acquire()
+        response = smms_uploader.upload_image(path)
+        return path, response["data"]["url"]
+
+    uploaded = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as ex:
+        futures = [ex.submit(upload, path) for path in pending]
+        for future in futures:
+            try:
+                path, url = future.result()
+                url_map[path] = url
+                uploaded[hashes[path]] = url
+                logger.info(f"Uploaded image to SM.MS: {url}")
+            except Exception as e:
+                logger.error(f"Failed to upload image to SM.MS: {str(e)}")
+
+    # Record fresh uploads so future runs (and duplicate figures in other
+    # papers) skip the round-trip entirely
+    if uploaded:
+        with session_scope() as session:
+            now = time.time()
+            for content_hash, url in uploaded.items():
+                session.merge(
+                    ImageUpload(hash=content_hash, url=url, created_at=now)
+                )
+
+    return url_map
+
+
+# Converted markdown cached per paper URL so an interrupted run resumes
+# past the download and OCR stages entirely
+MARKDOWN_CACHE_DIR = os.path.join("cache", "markdown")
+
+
+def _markdown_cache_dir(paper_url):
+    key = hashlib.sha256(paper_url.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(MARKDOWN_CACHE_DIR, key)
+
+
+def _markdown_cache_load(paper_url):
+    """Return (content, image_url_map) from the resume cache, or None"""
+    cache_dir = _markdown_cache_dir(paper_url)
+    md_path = os.path.join(cache_dir, "markdown.md")
+    if not os.path.exists(md_path):
+        return None
+    try:
+        with open(md_path, "r", encoding="utf-8") as f:
+            content = f.read()
+        image_url_map = {}
+        map_path = os.path.join(cache_dir, "images.json")
+        if os.path.exists(map_path):
+            with open(map_path, "rb") as f:
+                image_url_map = orjson.loads(f.read())
+        return content, image_url_map
+    except Exception:
+        logger.exception(f"Error reading markdown cache: {cache_dir}")
         return None
 
-    logger.info(f"Downloading paper PDF: {paper_url}")
+
+def _markdown_cache_store(paper_url, content, image_url_map):
+    """Persist a conversion result; atomic so a crash never leaves a
+    half-written markdown.md to be trusted on the next run"""
     try:
-        output_dir = config.get("output_dir", "./data")
-        download_result = download_pdf(paper_url, output_file_dir=output_dir)
+        cache_dir = _markdown_cache_dir(paper_url)
+        os.makedirs(cache_dir, exist_ok=True)
+        md_path = os.path.join(cache_dir, "markdown.md")
+        with open(f"{md_path}.tmp", "w", encoding="utf-8") as f:
+            f.write(content)
+        os.replace(f"{md_path}.tmp", md_path)
+        map_path = os.path.join(cache_dir, "images.json")
+        with open(f"{map_path}.tmp", "wb") as f:
+            f.write(orjson.dumps(image_url_map))
+        os.replace(f"{map_path}.tmp", map_path)
+    except Exception:
+        logger.exception(f"Error writing markdown cache for: {paper_url}")
 
-        # Unpack results - returns (filename, arxiv_url)
-        if isinstance(download_result, tuple) and len(download_result) == 2:
-            latest_pdf, arxiv_url = download_result
-        else:
-            # Backward compatibility
-            latest_pdf = download_result
-            arxiv_url = None
 
-        if not latest_pdf:
-            logger.error("Downloaded PDF file not found")
-            return None
+def convert_paper_to_markdown(paper_info, pdf_file, arxiv_url=None):
+    """OCR stage: convert a downloaded PDF to Markdown and handle images
 
-        latest_pdf = os.path.join(output_dir, latest_pdf)
+    Returns (content, image_url_map) where image_url_map maps local image
+    paths to their uploaded online URLs, or None on failure.
+    """
+    try:
+        output_dir = config.get("output_dir", "./data")
+        latest_pdf = os.path.join(output_dir, pdf_file)
         logger.info(f"Converting PDF to Markdown: {latest_pdf}")
 
         # Get converter from config
@@ -196,7 +415,13 @@ def process_paper(paper_info):
         date = datetime.now().strftime("%Y-%m-%d")
         paper_id = paper_info.id
         image_dir = f"images_{paper_id}_{date}"
-        os.makedirs(os.path.join(output_dir, image_dir), exist_ok=True)
+        # Per-paper result file: OCR stage workers run concurrently and
+        # would otherwise clobber a shared result.json
+        result_path = f"result_{paper_id}.json"
+        # Build the base path once; the per-image loop only appends the
+        # filename instead of re-joining (and re-checking) the directory
+        img_base_dir = os.path.join(output_dir, image_dir)
+        os.makedirs(img_base_dir, exist_ok=True)
 
         # Initialize image hosting service
         try:
@@ -211,35 +436,43 @@ def process_paper(paper_info):
 
         if converter == "doc2x":
             logger.info("Using doc2x for PDF to Markdown conversion")
-            convert_to_markdown_doc2x(latest_pdf)
+            result_path = convert_to_markdown_doc2x(latest_pdf, result_path=result_path)
 
             try:
-                with open("result.json", "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    pages_info = data["pages"]
-
-                content = "".join(page["md"] for page in pages_info)
+                # doc2x output carries no embedded base64 payloads, so the
+                # C-speed orjson parse beats streaming here; the image-heavy
+                # Mistral path below keeps ijson for its memory profile
+                with open(result_path, "rb") as f:
+                    data = orjson.loads(f.read())
+                content = "".join(page["md"] for page in data["pages"])
             except Exception as e:
                 logger.error(f"Error processing doc2x output: {str(e)}")
                 return None
 
         else:  # Default to mistral_ocr
             logger.info("Using Mistral OCR for PDF to Markdown conversion")
-            convert_to_markdown_mistral(latest_pdf)
+            result_path = convert_to_markdown_mistral(latest_pdf, result_path=result_path)
 
             try:
-                with open("result.json", "r", encoding="utf-8") as f:
-                    ocr_response = json.load(f)
 
-                content = ""
+                def _iter_pages():
+                    # Stream pages one at a time - OCR responses with
+                    # embedded base64 images can run to hundreds of MB
+                    # if materialized as one dict
+                    with open(result_path, "rb") as f:
+                        yield from ijson.items(f, "pages.item")
+
+                parts = []  # Page markdown fragments, joined once at the end
                 image_refs = set()  # Track image references to avoid duplicates
+                pending_uploads = []  # Saved images awaiting upload
 
                 # Process each page in the OCR response
-                for page in ocr_response["pages"]:
+                for page in _iter_pages():
                     if not page.get("markdown"):
                         continue
 
                     page_content = page["markdown"]
+                    page_replacements = {}  # ![id](id) literal -> new ref
 
                     # Process images in this page
                     for img in page.get("images", []):
@@ -248,37 +481,25 @@ def process_paper(paper_info):
                             continue  # Skip duplicate image references
 
                         # Create descriptive filename for the image
-                        img_filename = os.path.join(output_dir, image_dir, img_id)
+                        img_filename = f"{img_base_dir}{os.sep}{img_id}"
 
                         # Handle base64 encoded images
                         if img.get("image_base64"):
-                            import base64
-
                             try:
-                                # Remove the data:image/jpeg;base64, prefix
-                                image_base64 = img["image_base64"].replace(
-                                    "data:image/jpeg;base64,", ""
-                                )
-                                img_data = base64.b64decode(image_base64)
+                                # Strip the data:<mime>;base64, prefix by
+                                # splitting once at the comma - .replace would
+                                # copy the whole multi-MB payload to drop a
+                                # prefix that only ever sits at byte 0
+                                raw = img["image_base64"]
+                                if raw.startswith("data:"):
+                                    raw = raw.split(",", 1)[1]
+                                img_data = base64.b64decode(raw, validate=False)
                                 with open(img_filename, "wb") as img_file:
                                     img_file.write(img_data)
                                 logger.info(f"Saved base64 image to: {img_filename}")
 
-                                # Upload to image hosting service if available
-                                if smms_uploader:
-                                    try:
-                                        response = smms_uploader.upload_image(
-                                            img_filename
-                                        )
-                                        image_url = response["data"]["url"]
-                                        image_url_map[img_filename] = image_url
-                                        logger.info(
-                                            f"Uploaded image to SM.MS: {image_url}"
-                                        )
-                                    except Exception as e:
-                                        logger.error(
-                                            f"Failed to upload image to SM.MS: {str(e)}"
-                                        )
+                                # Queue for the concurrent upload pass below
+                                pending_uploads.append(img_filename)
                             except Exception as e:
                                 logger.error(f"Error saving base64 image: {str(e)}")
                                 continue
@@ -286,52 +507,66 @@ def process_paper(paper_info):
                             # Handle file-based images
                             source_path = img_id
                             if os.path.exists(source_path):
-                                import shutil
-
-                                shutil.copy2(source_path, img_filename)
+                                # Hardlink instead of copying - zero bytes
+                                # moved; fall back to a real copy across
+                                # filesystems (EXDEV) or on platforms
+                                # without hardlink support
+                                try:
+                                    if os.path.exists(img_filename):
+                                        os.remove(img_filename)
+                                    os.link(source_path, img_filename)
+                                except OSError:
+                                    shutil.copy2(source_path, img_filename)
                                 logger.info(
-                                    f"Copied image from {source_path} to {img_filename}"
+                                    f"Linked image from {source_path} to {img_filename}"
                                 )
 
-                                # Upload to image hosting service if available
-                                if smms_uploader:
-                                    try:
-                                        response = smms_uploader.upload_image(
-                                            img_filename
-                                        )
-                                        image_url = response["data"]["url"]
-                                        image_url_map[img_filename] = image_url
-                                        logger.info(
-                                            f"Uploaded image to SM.MS: {image_url}"
-                                        )
-                                    except Exception as e:
-                                        logger.error(
-                                            f"Failed to upload image to SM.MS: {str(e)}"
-                                        )
+                                # Queue for the concurrent upload pass below
+                                pending_uploads.append(img_filename)
                             else:
                                 logger.warning(f"Image file not found: {source_path}")
                                 continue
 
-                        # Update image references in the markdown
-                        page_content = page_content.replace(
-                            f"![{img_id}]({img_id})",
-                            f"![Figure from paper]({img_filename})",
+                        # Record the reference rewrite for the single pass below
+                        page_replacements[f"![{img_id}]({img_id})"] = (
+                            f"![Figure from paper]({img_filename})"
                         )
 
                         image_refs.add(img_id)
                         logger.info(f"Processed image: {img_id}")
 
-                    content += page_content
+                    # Rewrite all image references in one regex pass instead
+                    # of rescanning the page text once per image
+                    if page_replacements:
+                        pattern = re.compile(
+                            "|".join(
+                                re.escape(ref)
+                                for ref in sorted(
+                                    page_replacements, key=len, reverse=True
+                                )
+                            )
+                        )
+                        page_content = pattern.sub(
+                            lambda m: page_replacements[m.group(0)], page_content
+                        )
+
+                    parts.append(page_content)
+
+                # Upload all saved images concurrently instead of one
+                # blocking round-trip per image inside the page loop
+                if smms_uploader and pending_uploads:
+                    image_url_map.update(upload_images(smms_uploader, pending_uploads))
 
-                if not content:
+                if not parts:
                     logger.error("No content extracted from OCR response")
                     return None
 
-            except Exception as e:
-                logger.error(f"Error processing Mistral OCR output: {str(e)}")
-                import traceback
+                content = "".join(parts)
 
-                logger.error(traceback.format_exc())
+            except Exception:
+                # logger.exception only formats the traceback when a sink
+                # actually accepts the record
+                logger.exception("Error processing Mistral OCR output")
                 return None
 
         # Select best available paper link
@@ -350,118 +585,338 @@ def process_paper(paper_info):
 """
         content = paper_metadata + content
 
-        # Generate AI summary
-        summary = summarize_paper(content)
+        # Keyed by the pre-download URL so the resume check (which runs
+        # before any arXiv URL is discovered) finds it
+        cache_url = paper_info.arxiv_link or paper_info.paper_link
+        if cache_url:
+            _markdown_cache_store(cache_url, content, image_url_map)
+
+        return content, image_url_map
+
+    except Exception:
+        logger.exception("Error converting paper to Markdown")
+
+    return None
+
+
+def summarize_and_save(paper_info, content, image_url_map):
+    """Summarization stage: generate the AI summary, swap local image paths
+    for their online URLs and write the per-paper summary file"""
+    try:
+        date = datetime.now().strftime("%Y-%m-%d")
+
+        # Check the summary cache first - identical content (same paper,
+        # re-run pipeline) never needs a second paid LLM round-trip
+        summary = None
+        cache_key = None
+        if config.get("summary_cache", {}).get("enabled", True):
+            digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+            cache_key = f"{digest}|{SUMMARIZER_VERSION}"
+            with session_scope() as session:
+                cached = session.query(SummaryCache).filter_by(hash=cache_key).first()
+                if cached:
+                    summary = cached.summary
+            if summary is not None:
+                logger.info(f"Using cached summary for: {paper_info.title}")
+
+        if summary is None:
+            # Generate AI summary
+            summary = summarize_paper(content)
+            if cache_key is not None:
+                with session_scope() as session:
+                    session.merge(
+                        SummaryCache(
+                            hash=cache_key, summary=summary, created_at=time.time()
+                        )
+                    )
 
         # Replace local image paths with online URLs
         processed_summary = summary
 
-        # Enhanced replacement logic to handle different path formats
-        def normalize_path(path):
-            """Normalize path by removing leading './' and ensuring consistent format"""
-            return path.lstrip("./")
-
-        # Create a map with multiple path variants for each image
-        enhanced_image_map = {}
-        for local_path, online_url in image_url_map.items():
-            # Original path
-            enhanced_image_map[local_path] = online_url
-
-            # Path without leading ./
-            normalized_path = normalize_path(local_path)
-            if normalized_path != local_path:
-                enhanced_image_map[normalized_path] = online_url
-
-            # Path with leading ./ if not present
-            if not local_path.startswith("./"):
-                enhanced_image_map[f"./{local_path}"] = online_url
-
-            # Log all path variants
-            logger.info(f"Image path variants for {local_path} -> {online_url}:")
-            for variant in enhanced_image_map.keys():
-                if enhanced_image_map[variant] == online_url:
-                    logger.info(f"  - {variant}")
-
-        # Perform multiple passes of replacement to ensure all variants are caught
-        for local_path, online_url in enhanced_image_map.items():
-            logger.info(
-                f"Replacing local image path with online URL: {local_path} -> {online_url}"
+        if image_url_map:
+
+            def normalize_path(path):
+                """Normalize path by removing leading './' and ensuring consistent format"""
+                return path.lstrip("./")
+
+            # Create a map with multiple path variants for each image
+            enhanced_image_map = {}
+            for local_path, online_url in image_url_map.items():
+                # Original path
+                enhanced_image_map[local_path] = online_url
+
+                # Path without leading ./
+                normalized_path = normalize_path(local_path)
+                if normalized_path != local_path:
+                    enhanced_image_map[normalized_path] = online_url
+
+                # Path with leading ./ if not present
+                if not local_path.startswith("./"):
+                    enhanced_image_map[f"./{local_path}"] = online_url
+
+            # Basename fallback for paths the LLM rewrote into a different
+            # directory structure
+            basename_map = {
+                os.path.basename(local_path): online_url
+                for local_path, online_url in image_url_map.items()
+            }
+
+            # One alternation over every known variant, longest first so a
+            # full path wins over its own suffix - the summary is scanned
+            # once instead of once per variant
+            alternatives = sorted(
+                map(re.escape, enhanced_image_map), key=len, reverse=True
             )
-            processed_summary = processed_summary.replace(local_path, online_url)
-
-        # Additional pass using regex to catch paths with different directory structures
-        import re
-
-        for local_path, online_url in image_url_map.items():
-            # Extract the image filename from the path
-            filename = os.path.basename(local_path)
-            # Create a pattern that matches the filename in various directory structures
-            pattern = re.escape(filename)
-            # Find all matches of the filename in the summary
-            for match in re.finditer(
-                f"(\\./)?(?:data/)?images_[^/]+/{pattern}", processed_summary
-            ):
-                matched_path = match.group(0)
-                if (
-                    matched_path in processed_summary
-                    and matched_path not in enhanced_image_map
-                ):
-                    logger.info(
-                        f"Regex replacing path variant: {matched_path} -> {online_url}"
-                    )
-                    processed_summary = processed_summary.replace(
-                        matched_path, online_url
-                    )
+            alternatives.extend(
+                f"(?:\\./)?(?:data/)?images_[^/]+/{re.escape(basename)}"
+                for basename in basename_map
+            )
+            pattern = re.compile("|".join(alternatives))
+
+            def _to_online_url(match):
+                matched = match.group(0)
+                if matched in enhanced_image_map:
+                    return enhanced_image_map[matched]
+                return basename_map.get(os.path.basename(matched), matched)
+
+            logger.info(f"Replacing {len(image_url_map)} image paths with online URLs")
+            # Per-variant detail is DEBUG-only and lazily formatted, so the
+            # common INFO run pays nothing for it
+            logger.opt(lazy=True).debug(
+                "Image path variants: {}",
+                lambda: ", ".join(
+                    f"{variant} -> {url}" for variant, url in enhanced_image_map.items()
+                ),
+            )
+            processed_summary = pattern.sub(_to_online_url, processed_summary)
 
-        # Save summary to file
+        # Persist the per-paper file, but hand the summary itself back so
+        # the digest can be written without re-reading what we just wrote
         filename = f"summary_{paper_info.id}_{date}.md"
         with open(filename, "w", encoding="utf-8") as f:
             f.write(processed_summary)
 
         logger.info(f"Paper summary saved to: {filename}")
-        return filename
-
-    except Exception as e:
-        logger.error(f"Error downloading PDF: {str(e)}")
-        import traceback
+        return {
+            "id": paper_info.id,
+            "title": paper_info.title,
+            "summary": processed_summary,
+            "file": filename,
+        }
 
-        logger.error(traceback.format_exc())
+    except Exception:
+        logger.exception("Error summarizing paper")
 
     return None
 
 
+def process_paper(paper_info, pdf_file=None, arxiv_url=None):
+    """Process a single paper end to end: download, convert, summarize
+
+    If pdf_file is given the PDF was already downloaded (e.g. by the
+    pipeline's download stage) and the download step is skipped.
+    """
+    logger.info(f"Starting to process paper: {paper_info.title}")
+
+    # Use arXiv link if available, otherwise use paper_link
+    paper_url = (
+        paper_info.arxiv_link if paper_info.arxiv_link else paper_info.paper_link
+    )
+
+    if not paper_url:
+        logger.error("Paper has no available PDF link")
+        return None
+
+    # Resume cache: a previously converted paper skips download and OCR
+    cached = _markdown_cache_load(paper_url)
+    if cached is not None:
+        logger.info(f"Using cached markdown for: {paper_info.title}")
+        content, image_url_map = cached
+        return summarize_and_save(paper_info, content, image_url_map)
+
+    if pdf_file is None:
+        logger.info(f"Downloading paper PDF: {paper_url}")
+        output_dir = config.get("output_dir", "./data")
+        # download_pdf returns the filename it wrote - no need to scan
+        # the working directory for the newest .pdf afterwards
+        pdf_file, arxiv_url = download_pdf(paper_url, output_file_dir=output_dir)
+
+    if not pdf_file:
+        logger.error("Downloaded PDF file not found")
+        return None
+
+    result = convert_paper_to_markdown(paper_info, pdf_file, arxiv_url)
+    if result is None:
+        return None
+
+    content, image_url_map = result
+    return summarize_and_save(paper_info, content, image_url_map)
+
+
+async def process_all(top_papers):
+    """Run download, OCR and summarization as overlapping pipeline stages
+
+    Three workers are connected by bounded queues: while paper k is being
+    summarized, paper k+1 can be OCRed and paper k+2 downloaded. The
+    blocking OCR and LLM API calls run on small thread pools so they
+    don't stall the event loop.
+    """
+    output_dir = config.get("output_dir", "./data")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Bounded queues give backpressure: a slow stage stalls its producer
+    # instead of letting work (and downloaded PDFs) pile up unboundedly
+    queue_depth = config.get("pipeline", {}).get("queue_depth", 2)
+
+    loop = asyncio.get_running_loop()
+    download_q = asyncio.Queue(maxsize=queue_depth)
+    ocr_q = asyncio.Queue(maxsize=queue_depth)
+    summaries = []
+    sem = asyncio.Semaphore(4)
+
+    # Download stage input: workers pull papers from here so several
+    # PDFs transfer at once (the semaphore caps the fan-out)
+    paper_q = asyncio.Queue()
+    for paper in top_papers:
+        paper_q.put_nowait(paper)
+
+    async def downloader(session):
+        while True:
+            try:
+                paper = paper_q.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            paper_url = paper.arxiv_link or paper.paper_link
+            if not paper_url:
+                logger.error(f"Paper has no available PDF link: {paper.title}")
+                continue
+            # Resume cache: hand converted markdown straight to the
+            # summarize stage, skipping download and OCR
+            cached = _markdown_cache_load(paper_url)
+            if cached is not None:
+                logger.info(f"Using cached markdown for: {paper.title}")
+                content, image_url_map = cached
+                await ocr_q.put((paper, content, image_url_map))
+                continue
+            try:
+                pdf_file, arxiv_url = await download_pdf_async(
+                    session, paper_url, output_file_dir=output_dir, sem=sem
+                )
+            except Exception as e:
+                logger.error(f"Download failed for '{paper.title}': {e}")
+                continue
+            if not pdf_file:
+                logger.error(f"Downloaded PDF file not found for: {paper.title}")
+                continue
+            await download_q.put((paper, pdf_file, arxiv_url))
+
+    async def ocr_worker(ocr_pool):
+        while True:
+            item = await download_q.get()
+            if item is None:
+                # Re-queue the sentinel so sibling workers exit too
+                await download_q.put(None)
+                break
+            paper, pdf_file, arxiv_url = item
+            result = await loop.run_in_executor(
+                ocr_pool, convert_paper_to_markdown, paper, pdf_file, arxiv_url
+            )
+            if result is not None:
+                content, image_url_map = result
+                await ocr_q.put((paper, content, image_url_map))
+
+    async def summarizer(summary_pool):
+        while True:
+            item = await ocr_q.get()
+            if item is None:
+                await ocr_q.put(None)
+                break
+            paper, content, image_url_map = item
+            summary = await loop.run_in_executor(
+                summary_pool, summarize_and_save, paper, content, image_url_map
+            )
+            if summary:
+                summaries.append(summary)
+
+    # Papers are independent, so each stage also runs several papers at
+    # once; the work is network/API-bound so threads are the right pool
+    max_stage_workers = config.get("pipeline", {}).get("stage_workers", 4)
+    num_workers = max(1, min(len(top_papers), os.cpu_count() or 1, max_stage_workers))
+
+    connector = aiohttp.TCPConnector(limit=10, limit_per_host=4, keepalive_timeout=60)
+    with ThreadPoolExecutor(max_workers=num_workers) as ocr_pool:
+        with ThreadPoolExecutor(max_workers=num_workers) as summary_pool:
+            async with aiohttp.ClientSession(connector=connector) as session:
+                ocr_tasks = [
+                    asyncio.create_task(ocr_worker(ocr_pool))
+                    for _ in range(num_workers)
+                ]
+                summary_tasks = [
+                    asyncio.create_task(summarizer(summary_pool))
+                    for _ in range(num_workers)
+                ]
+                download_tasks = [
+                    asyncio.create_task(downloader(session))
+                    for _ in range(num_workers)
+                ]
+                await asyncio.gather(*download_tasks)
+                # All downloaders drained paper_q; one sentinel shuts the
+                # OCR workers down (they re-queue it for their siblings)
+                await download_q.put(None)
+                await asyncio.gather(*ocr_tasks)
+                await ocr_q.put(None)
+                await asyncio.gather(*summary_tasks)
+
+    return summaries
+
+
+def write_digest_report(summaries, output_path=None):
+    """Write one digest report from the run's summary dicts
+
+    The summarize stage hands back {id, title, summary} dicts, so the
+    digest is written straight from memory instead of re-reading the
+    per-paper files; a temp file + os.replace keeps readers from seeing
+    a half-written report.
+    """
+    if not summaries:
+        return None
+
+    date = datetime.now().strftime("%Y-%m-%d")
+    if output_path is None:
+        output_path = f"digest_{date}.md"
+
+    tmp_path = f"{output_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        out.write(f"# Paper Digest - {date}\n\n")
+        for i, entry in enumerate(summaries):
+            if i:
+                out.write("\n\n---\n\n")
+            out.write(entry["summary"])
+    os.replace(tmp_path, output_path)
+
+    logger.info(f"Digest report saved to: {output_path}")
+    return output_path
+
+
 def main():
     """Main pipeline function that orchestrates the paper processing workflow"""
     load_dotenv()  # Load environment variables
 
-    # Load configuration
-    config_path = os.path.join(os.path.dirname(__file__), "config.yaml")
-    try:
-        with open(config_path, "r", encoding="utf-8") as config_file:
-            config = yaml.safe_load(config_file)
-            paper_fetch_limit = config.get("paper_fetch", {}).get("limit", 100)
-            default_ranking_limit = config.get("paper_ranking", {}).get(
-                "default_limit", 3
-            )
-            fallback_ranking_limit = config.get("paper_ranking", {}).get(
-                "fallback_limit", 1
-            )
-            logger.info(f"Loaded configuration: paper_fetch_limit={paper_fetch_limit}")
-    except Exception as e:
-        logger.warning(f"Failed to load configuration from {config_path}: {str(e)}")
-        logger.warning("Using default values")
-        paper_fetch_limit = 100
-        default_ranking_limit = 3
-        fallback_ranking_limit = 1
+    # Reuse the module-level config instead of re-parsing config.yaml
+    paper_fetch_limit = config.get("paper_fetch", {}).get("limit", 100)
+    default_ranking_limit = config.get("paper_ranking", {}).get("default_limit", 3)
+    fallback_ranking_limit = config.get("paper_ranking", {}).get("fallback_limit", 1)
+    logger.info(f"Loaded configuration: paper_fetch_limit={paper_fetch_limit}")
 
     # Step 1: Get latest papers
     paper_count = fetch_latest_papers(limit=paper_fetch_limit)
 
     # Step 2: Rank papers and make selection
     with session_scope() as session:
-        # Check if there are any unread papers in the database
-        unread_papers_exist = (
-            session.query(Paper).filter_by(thoroughly_read=False).first() is not None
+        # Check if there are any unread papers in the database - a pure
+        # EXISTS query, no ORM row construction for a boolean answer
+        unread_papers_exist = session.scalar(
+            select(exists().where(Paper.thoroughly_read.is_(False)))
         )
 
     if paper_count == 0 and not unread_papers_exist:
@@ -483,12 +938,13 @@ def main():
             f"Selected 1 most interesting paper from database: {top_papers[0].title}"
         )
 
-    # Step 3: Process selected papers
-    summary_files = [
-        summary_file for paper in top_papers if (summary_file := process_paper(paper))
-    ]
+    # Step 3: Process selected papers (PDFs are downloaded concurrently)
+    summaries = asyncio.run(process_all(top_papers))
+
+    logger.info(f"Total summaries generated: {len(summaries)}")
 
-    logger.info(f"Total summary files generated: {len(summary_files)}")
+    # Step 4: Bundle the run's summaries into one digest
+    write_digest_report(summaries)
 
 
 if __name__ == "__main__":
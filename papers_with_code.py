@@ -1,11 +1,34 @@
 import requests
+import aiohttp
 from bs4 import BeautifulSoup
+import asyncio
+import functools
+import random
 import re
-from sqlalchemy import create_engine, Column, String, Integer, UniqueConstraint, Boolean
+from sqlalchemy import (
+    create_engine,
+    select,
+    Column,
+    String,
+    Integer,
+    UniqueConstraint,
+    Boolean,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import declarative_base, sessionmaker
-from sqlalchemy.exc import IntegrityError
 from logger_config import get_logger
-import time
+
+_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Compiled once; parse_paper_card runs for every card on every page
+_STARS_RE = re.compile(r"\d+")
+
+# Shared session for the sync scrape path: keeps the TCP/TLS connection
+# to paperswithcode.com alive across page fetches
+_SESSION = requests.Session()
+_SESSION.headers.update(_HEADERS)
 
 # Get logger for the current module
 logger = get_logger(__name__)
@@ -25,47 +48,87 @@ class Paper(Base):
     paper_download = Column(String)
     code_link = Column(String)
     arxiv_link = Column(String)
-    thoroughly_read = Column(Boolean, default=False)
+    # Indexed: the ranking path filters unread papers on every run
+    thoroughly_read = Column(Boolean, default=False, index=True)
 
     # Add composite unique constraint
     __table_args__ = (UniqueConstraint("title", "paper_link", name="_title_paper_uc"),)
 
 
+def ensure_schema(engine):
+    """Bring an existing papers.db up to the current model
+
+    create_all only adds missing tables, so columns and indexes added to
+    the Paper model after a database was first created (arxiv_link, the
+    thoroughly_read index) have to be bolted on here. No-op when they
+    are already present or the table doesn't exist yet.
+    """
+    with engine.connect() as conn:
+        existing = {
+            row[1] for row in conn.exec_driver_sql("PRAGMA table_info(papers)")
+        }
+        if not existing:
+            return
+        if "arxiv_link" not in existing:
+            conn.exec_driver_sql("ALTER TABLE papers ADD COLUMN arxiv_link VARCHAR")
+            logger.info("Added arxiv_link column to papers table")
+        # The ranking path filters on thoroughly_read every run; grown
+        # databases created before the index existed need it added too
+        conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_papers_thoroughly_read "
+            "ON papers (thoroughly_read)"
+        )
+
+
+@functools.lru_cache(maxsize=1)
+def get_session_factory():
+    """Process-wide session factory for the standalone scripts
+
+    Engine construction and the create_all schema check happen once, no
+    matter how many sessions a run opens. Lazy (not at import) so merely
+    importing the model classes never touches papers.db.
+    """
+    engine = create_engine("sqlite:///papers.db")
+    Base.metadata.create_all(engine)
+    ensure_schema(engine)
+    return sessionmaker(bind=engine)
+
+
 def parse_paper_card(card):
-    # Extract title and paper link
-    title_elem = card.find("h1").find("a")
+    # select_one compiles to a single CSS match instead of chained
+    # find calls that each rescan the subtree
+    title_elem = card.select_one("h1 a")
     title = title_elem.text.strip()
     paper_link = "https://paperswithcode.com" + title_elem["href"]
 
     # Extract Github URL
-    github_link = card.find("span", {"class": "item-github-link"}).find("a")
+    github_link = card.select_one("span.item-github-link a")
     github_link = github_link["href"] if github_link else ""
 
     # Extract abstract
-    abstract_elem = card.find("p", {"class": "item-strip-abstract"})
+    abstract_elem = card.select_one("p.item-strip-abstract")
     abstract = abstract_elem.text.strip() if abstract_elem else ""
 
     # Extract star count
-    stars_elem = card.find("span", {"class": "badge-secondary"})
-    stars = re.search(r"\d+", stars_elem.text).group() if stars_elem else "0"
+    stars_elem = card.select_one("span.badge-secondary")
+    stars = _STARS_RE.search(stars_elem.text).group() if stars_elem else "0"
 
     # Extract paper and code links
     paper_download = ""
     code_link = ""
     arxiv_link = ""
 
-    for link in card.find_all("a", {"class": "badge"}):
+    for link in card.select("a.badge"):
         if "Paper" in link.text:
             paper_download = "https://paperswithcode.com" + link["href"]
         elif "Code" in link.text:
             code_link = "https://paperswithcode.com" + link["href"]
 
-    # Try to find arXiv link directly in main page
-    for link in card.find_all("a"):
-        href = link.get("href", "")
-        if "arxiv.org" in href:
-            arxiv_link = href
-            break
+    # Try to find arXiv link directly in main page - one substring-match
+    # CSS lookup instead of walking every anchor in the card
+    arxiv_elem = card.select_one('a[href*="arxiv.org"]')
+    if arxiv_elem:
+        arxiv_link = arxiv_elem["href"]
 
     return {
         "title": title,
@@ -79,107 +142,173 @@ def parse_paper_card(card):
     }
 
 
-def scrape_papers(base_url, page=1):
-    url = f"{base_url}?page={page}"
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-    }
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.content, "html.parser")
+def _parse_page(content):
+    """Parse one listing page into paper dicts (CPU-bound, runs off-loop)"""
+    # lxml parses these ~100KB pages several times faster than the pure
+    # Python html.parser backend
+    soup = BeautifulSoup(content, "lxml")
+    paper_cards = soup.select("div.infinite-item.paper-card")
+    return [parse_paper_card(card) for card in paper_cards]
 
-    # Find all paper cards
-    paper_cards = soup.find_all("div", {"class": "row infinite-item item paper-card"})
 
-    # Parse information from each card
-    papers = []
-    for card in paper_cards:
-        paper_info = parse_paper_card(card)
-        papers.append(paper_info)
-
-    return papers
+def scrape_papers(base_url, page=1):
+    url = f"{base_url}?page={page}"
+    response = _SESSION.get(url)
+    return _parse_page(response.content)
 
 
-def scrape_papers_with_pagination(base_url, target_count=None, max_pages=100):
+async def _fetch_page(session, sem, base_url, page, max_retries=3):
+    """Fetch one listing page, backing off on 429s; returns bytes or None"""
+    url = f"{base_url}?page={page}"
+    async with sem:
+        for attempt in range(max_retries):
+            try:
+                async with session.get(
+                    url, timeout=aiohttp.ClientTimeout(total=30)
+                ) as response:
+                    if response.status == 429:
+                        delay = float(response.headers.get("Retry-After") or 0)
+                        if not delay:
+                            delay = min(30, 2**attempt + random.uniform(0, 1))
+                        logger.warning(
+                            f"Rate limited on page {page}, retrying in {delay:.1f}s"
+                        )
+                        await asyncio.sleep(delay)
+                        continue
+                    response.raise_for_status()
+                    return await response.read()
+            except Exception as e:
+                if attempt == max_retries - 1:
+                    logger.error(f"Failed to fetch page {page}: {e}")
+                    return None
+                await asyncio.sleep(min(30, 2**attempt + random.uniform(0, 1)))
+    return None
+
+
+async def _scrape_pages_async(base_url, target_count, max_pages):
+    """Scrape listing pages concurrently
+
+    Page 1 is probed alone to learn the per-page paper count, then the
+    remaining pages are fetched in waves of up to five in flight at once
+    (bounded by a semaphore so we stay polite); HTML parsing runs in the
+    default executor so the event loop keeps the sockets busy.
+    """
+    sem = asyncio.Semaphore(5)
+    loop = asyncio.get_running_loop()
     all_papers = []
-    page = 1
-
-    while True:
-        # Break if we've reached target count
-        if target_count and len(all_papers) >= target_count:
-            break
 
-        # Break if we've reached max pages
-        if page > max_pages:
-            break
+    async def fetch_and_parse(session, page):
+        body = await _fetch_page(session, sem, base_url, page)
+        if not body:
+            return []
+        return await loop.run_in_executor(None, _parse_page, body)
 
-        papers = scrape_papers(base_url, page)
-
-        # Break if no papers found on current page
+    async with aiohttp.ClientSession(headers=_HEADERS) as session:
+        papers = await fetch_and_parse(session, 1)
         if not papers:
-            break
-
+            return all_papers
         all_papers.extend(papers)
-        logger.info(f"Scraped page {page}, total papers so far: {len(all_papers)}")
-        page += 1
+        logger.info(f"Scraped page 1, total papers so far: {len(all_papers)}")
+        per_page = len(papers)
+
+        page = 2
+        while page <= max_pages:
+            if target_count and len(all_papers) >= target_count:
+                break
+
+            # Size the wave to what's still needed so we don't over-fetch
+            wave = 5
+            if target_count:
+                remaining_pages = -(-(target_count - len(all_papers)) // per_page)
+                wave = min(wave, remaining_pages)
+            pages = range(page, min(page + wave, max_pages + 1))
+            if not pages:
+                break
+
+            results = await asyncio.gather(
+                *(fetch_and_parse(session, p) for p in pages)
+            )
+
+            done = False
+            for p, papers in zip(pages, results):
+                if not papers:
+                    done = True
+                    break
+                all_papers.extend(papers)
+                logger.info(
+                    f"Scraped page {p}, total papers so far: {len(all_papers)}"
+                )
+            if done:
+                break
+            page = pages[-1] + 1
+
+    return all_papers
 
-        # Add a 2-second delay to avoid hitting the server too quickly
-        time.sleep(2)
 
+def scrape_papers_with_pagination(base_url, target_count=None, max_pages=100):
+    all_papers = asyncio.run(_scrape_pages_async(base_url, target_count, max_pages))
     return all_papers[:target_count] if target_count else all_papers
 
 
 def save_papers_to_db(papers, session):
-    new_count = 0
-    updated_count = 0
-
-    for paper_info in papers:
-        title = paper_info["title"]
-        paper_link = paper_info["paper_link"]
-
-        # Look for existing paper in the database by title and paper link
-        paper = session.query(Paper).filter_by(title=title).first()
-
-        if paper:
-            # Update existing paper
-            paper.github_link = paper_info["github_link"]
-            paper.abstract = paper_info["abstract"]
-            paper.stars = int(paper_info["stars"])
-            paper.paper_link = paper_link
-            paper.paper_download = paper_info["paper_download"]
-            paper.code_link = paper_info["code_link"]
-            paper.arxiv_link = paper_info.get("arxiv_link", "")
-            updated_count += 1
-        else:
-            # Create new paper
-            try:
-                new_paper = Paper(
-                    title=title,
-                    github_link=paper_info["github_link"],
-                    abstract=paper_info["abstract"],
-                    stars=int(paper_info["stars"]),
-                    paper_link=paper_link,
-                    paper_download=paper_info["paper_download"],
-                    code_link=paper_info["code_link"],
-                    arxiv_link=paper_info.get("arxiv_link", ""),
-                    thoroughly_read=False,
-                )
-                session.add(new_paper)
-                new_count += 1
-            except IntegrityError:
-                session.rollback()
-                logger.warning(f"Paper already exists: {title}")
-                continue
-
-    # Commit all changes
+    """Insert-or-update all papers with a single upsert statement
+
+    One INSERT ... ON CONFLICT DO UPDATE replaces the per-paper
+    SELECT-then-add/update round-trips; SQLite resolves each conflict
+    on title in-engine, and thoroughly_read is deliberately left out of
+    the update set so re-scraping never unreads a paper.
+    """
+    if not papers:
+        return 0, 0
+
+    rows = [
+        {
+            "title": paper_info["title"],
+            "github_link": paper_info["github_link"],
+            "abstract": paper_info["abstract"],
+            "stars": int(paper_info["stars"]),
+            "paper_link": paper_info["paper_link"],
+            "paper_download": paper_info["paper_download"],
+            "code_link": paper_info["code_link"],
+            "arxiv_link": paper_info.get("arxiv_link", ""),
+            "thoroughly_read": False,
+        }
+        for paper_info in papers
+    ]
+
+    # One IN query tells us exactly which titles already exist, so the
+    # new/updated split is correct even if other writers touch the table
+    # while the upsert runs (a before/after row count would misattribute)
+    existing_titles = {
+        title
+        for (title,) in session.execute(
+            select(Paper.title).where(Paper.title.in_([r["title"] for r in rows]))
+        )
+    }
+
+    stmt = sqlite_insert(Paper).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["title"],
+        set_={
+            "github_link": stmt.excluded.github_link,
+            "abstract": stmt.excluded.abstract,
+            "stars": stmt.excluded.stars,
+            "paper_link": stmt.excluded.paper_link,
+            "paper_download": stmt.excluded.paper_download,
+            "code_link": stmt.excluded.code_link,
+            "arxiv_link": stmt.excluded.arxiv_link,
+        },
+    )
+    session.execute(stmt)
     session.commit()
+
+    updated_count = sum(1 for row in rows if row["title"] in existing_titles)
+    new_count = len(rows) - updated_count
     return new_count, updated_count
 
 
 def main():
-    engine = create_engine("sqlite:///papers.db")
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    session = get_session_factory()()
 
     base_url = "https://paperswithcode.com/latest"
     # Scrape papers with target count (e.g., 100 papers)
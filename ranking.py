@@ -1,8 +1,10 @@
 import os
+import functools
+import hashlib
 import json
-from sqlalchemy import create_engine, func
-from sqlalchemy.orm import sessionmaker
-from papers_with_code import Paper, Base
+import random
+import re
+from papers_with_code import Paper, get_session_factory
 from openai import OpenAI
 from typing import List
 from logger_config import get_logger
@@ -11,60 +13,103 @@ from dotenv import load_dotenv
 # Get logger for the current module
 logger = get_logger(__name__)
 
+# Compiled once for the non-JSON fallback in get_chatgpt_ranking
+_NUMBER_RE = re.compile(r"\d+")
 
-def get_random_papers(session, limit: int = 20) -> List[Paper]:
-    """Get random unread papers from database."""
+# Raw LLM responses cached on disk by prompt hash, so re-running the
+# ranking over an unchanged paper batch skips the paid API call
+_LLM_CACHE_DIR = ".llm_cache"
+
+
+@functools.lru_cache(maxsize=1)
+def _client() -> OpenAI:
+    """One OpenAI client per process - construction sets up the HTTP pool"""
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"), base_url="https://api.deepseek.com"
+    )
+
+
+def get_random_papers(session, limit: int = 20) -> List:
+    """Get random unread papers from database.
+
+    ORDER BY RANDOM() shuffles every unread row; pulling just the
+    (indexed) unread ids and sampling them in Python keeps the heavy
+    fetch proportional to the sample size. Only the columns the prompt
+    uses come back - plain (id, title, abstract) rows, no ORM objects.
+    """
+    unread_ids = [
+        row[0] for row in session.query(Paper.id).filter_by(thoroughly_read=False)
+    ]
+    if not unread_ids:
+        return []
+    chosen = random.sample(unread_ids, min(limit, len(unread_ids)))
     return (
-        session.query(Paper)
-        .filter_by(thoroughly_read=False)
-        .order_by(func.random())
-        .limit(limit)
+        session.query(Paper.id, Paper.title, Paper.abstract)
+        .filter(Paper.id.in_(chosen))
         .all()
     )
 
 
 def create_prompt(papers: List[Paper]) -> str:
-    """Create prompt for ChatGPT with paper information."""
-    papers_info = []
-    for i, paper in enumerate(papers, 1):
-        papers_info.append(
-            f"Paper {i}:\n"
-            f"ID: {paper.id}\n"
-            f"Title: {paper.title}\n"
-            f"Abstract: {paper.abstract}\n"
-        )
+    """Create prompt for ChatGPT with paper information.
+
+    A single generator feeds one join instead of building an
+    intermediate fragment list; abstracts are clipped to 1000 chars
+    since the ranking only needs the gist and 20 full abstracts eat
+    into the token budget.
+    """
+    papers_info = "\n".join(
+        f"Paper {i}:\n"
+        f"ID: {paper.id}\n"
+        f"Title: {paper.title}\n"
+        f"Abstract: {(paper.abstract or '')[:1000]}\n"
+        for i, paper in enumerate(papers, 1)
+    )
 
-    prompt = (
+    return (
         "Below are 20 research papers. Please analyze them and select the 3 most interesting "
         "papers based on their potential impact, innovation, and practical applications. "
         "Return only a JSON array containing the IDs of the 3 selected papers in order of "
-        "preference. Example format: [123, 456, 789]\n\n"
-        f"{'\n'.join(papers_info)}"
+        "preference. Example format: [123, 456, 789]\n\n" + papers_info
     )
-    return prompt
 
 
 def get_chatgpt_ranking(prompt: str) -> List[int]:
     """Get paper rankings from ChatGPT."""
     try:
-        client = OpenAI(
-            api_key=os.getenv("OPENAI_API_KEY"), base_url="https://api.deepseek.com"
-        )
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a research paper analyst. Respond only with a JSON array of paper IDs.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.7,
-            max_tokens=100,
+        cache_path = os.path.join(
+            _LLM_CACHE_DIR,
+            hashlib.sha256(prompt.encode("utf-8")).hexdigest() + ".txt",
         )
 
-        # Extract the response text
-        result = response.choices[0].message.content.strip()
+        result = None
+        if os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                result = f.read()
+            logger.info("Using cached ranking response")
+
+        if result is None:
+            response = _client().chat.completions.create(
+                model="deepseek-chat",
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "You are a research paper analyst. Respond only with a JSON array of paper IDs.",
+                    },
+                    {"role": "user", "content": prompt},
+                ],
+                temperature=0.7,
+                max_tokens=100,
+            )
+
+            # Extract the response text
+            result = response.choices[0].message.content.strip()
+
+            os.makedirs(_LLM_CACHE_DIR, exist_ok=True)
+            tmp_path = f"{cache_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(result)
+            os.replace(tmp_path, cache_path)
 
         logger.info(f"ChatGPT response: {result}")
 
@@ -74,9 +119,7 @@ def get_chatgpt_ranking(prompt: str) -> List[int]:
             return paper_ids
         except json.JSONDecodeError:
             # If not valid JSON, try to extract numbers
-            import re
-
-            numbers = re.findall(r"\d+", result)
+            numbers = _NUMBER_RE.findall(result)
             paper_ids = [int(num) for num in numbers[:3]]  # Take first 3 numbers
             logger.warning(f"Failed to parse JSON, extracted numbers: {paper_ids}")
             return paper_ids
@@ -87,9 +130,12 @@ def get_chatgpt_ranking(prompt: str) -> List[int]:
 
 
 def mark_papers_as_read(session, papers: List[Paper]):
-    """Mark papers as thoroughly read."""
-    for paper in papers:
-        paper.thoroughly_read = True
+    """Mark papers as thoroughly read with a single UPDATE statement."""
+    if not papers:
+        return
+    session.query(Paper).filter(Paper.id.in_([p.id for p in papers])).update(
+        {Paper.thoroughly_read: True}, synchronize_session=False
+    )
     session.commit()
 
 
@@ -97,11 +143,8 @@ def main():
     # Load environment variables from .env file
     load_dotenv()
 
-    # Setup database connection
-    engine = create_engine("sqlite:///papers.db")
-    Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    # Setup database connection via the shared factory
+    session = get_session_factory()()
 
     try:
         # Get random unread papers
@@ -114,11 +157,19 @@ def main():
         prompt = create_prompt(papers)
         ranked_paper_ids = get_chatgpt_ranking(prompt)
 
-        # Get top 3 papers
+        # Get top 3 papers - one IN query instead of a SELECT per rank,
+        # reindexed by id so the ranking order is preserved
+        papers_by_id = {
+            paper.id: paper
+            for paper in session.query(Paper)
+            .filter(Paper.id.in_(ranked_paper_ids))
+            .all()
+        }
+
         top_papers = []
         logger.info("Top 3 recommended papers:")
         for rank, paper_id in enumerate(ranked_paper_ids, 1):
-            paper = session.query(Paper).filter_by(id=paper_id).first()
+            paper = papers_by_id.get(paper_id)
             if paper:
                 top_papers.append(paper)
                 logger.info(f"{rank}. [ID: {paper.id}] {paper.title}")
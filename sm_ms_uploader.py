@@ -1,8 +1,19 @@
 import requests
+import aiohttp
 import argparse
+import asyncio
+import hashlib
+import mimetypes
+import mmap
 import os
 import json
-from typing import Optional, Dict, Any
+import orjson
+import random
+import time
+from requests.adapters import HTTPAdapter
+from requests_toolbelt.multipart.encoder import MultipartEncoder
+from urllib3.util.retry import Retry
+from typing import List, Optional, Dict, Any
 import dotenv
 
 dotenv.load_dotenv()
@@ -11,22 +22,145 @@ class SMmsUploader:
     """A client for uploading images to SM.MS and retrieving markdown links."""
     
     BASE_URL = "https://sm.ms/api/v2"
-    
-    def __init__(self, token: Optional[str] = None):
+    # Cap on any single request, so a stalled upload fails fast instead of
+    # hanging the caller indefinitely (requests has no default timeout)
+    TIMEOUT = 30.0
+    # Successful responses cached by content hash, so re-uploading an
+    # identical file returns the stored response without a round-trip
+    CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "smms")
+
+    def __init__(self, token: Optional[str] = None, use_cache: bool = True):
         """
         Initialize the SM.MS uploader.
-        
+
         Args:
             token: Your SM.MS API token. If not provided, looks for SMMS_API_KEY environment variable.
+            use_cache: Serve repeat uploads of identical content from the local response cache.
         """
         self.token = token or os.environ.get("SMMS_API_KEY")
         if not self.token:
             raise ValueError("API token required. Set SMMS_API_KEY environment variable or pass token parameter.")
-        
+
         self.headers = {
             "Authorization": self.token
         }
-    
+        # One session for the uploader's lifetime: keep-alive reuses the
+        # TCP/TLS connection across uploads instead of handshaking per call
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Retry transient failures on idempotent requests with exponential
+        # backoff. POSTs are deliberately excluded: their body is a
+        # streamed MultipartEncoder urllib3 can't rewind, so upload_image
+        # does its own retries by rebuilding the body per attempt.
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET"],
+        )
+        self.session.mount(
+            "https://",
+            HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=10),
+        )
+        self.use_cache = use_cache
+
+    @staticmethod
+    def _file_hash(image_path: str) -> str:
+        """SHA-256 of the file content.
+
+        The file is memory-mapped and hashed in one hashlib call, so
+        OpenSSL digests the whole buffer without a Python-level read
+        loop; empty files can't be mapped and hash to the empty digest.
+        """
+        with open(image_path, 'rb') as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                return hashlib.sha256(b'').hexdigest()
+            try:
+                return hashlib.sha256(mm).hexdigest()
+            finally:
+                mm.close()
+
+    @staticmethod
+    def _validate_image(image_path: str) -> str:
+        """Check a file is uploadable before spending bandwidth on it
+
+        Rejects locally what the server would reject anyway (missing,
+        >5 MiB, or non-image files) and returns the guessed MIME type.
+        """
+        if not os.path.exists(image_path):
+            raise FileNotFoundError(f"Image not found: {image_path}")
+        size = os.path.getsize(image_path)
+        if size > 5 * 1024 * 1024:
+            raise ValueError(f"File too large for SM.MS ({size} bytes, limit 5 MiB): {image_path}")
+        mime_type = mimetypes.guess_type(image_path)[0]
+        if not mime_type or not mime_type.startswith('image/'):
+            raise ValueError(f"Not an image file: {image_path}")
+        return mime_type
+
+    def _cache_path_for(self, image_path: str) -> Optional[str]:
+        """Cache file for this content, or None when caching is off."""
+        if not self.use_cache:
+            return None
+        return os.path.join(self.CACHE_DIR, f"{self._file_hash(image_path)}.json")
+
+    @staticmethod
+    def _cache_load(cache_path: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Return the cached response for this content, if any."""
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    def _cache_store(self, cache_path: Optional[str], response_data: Dict[str, Any]) -> None:
+        """Store a successful response under its content hash.
+
+        Atomic write: a crash mid-dump can't leave a truncated JSON to
+        be trusted on the next run.
+        """
+        if not cache_path:
+            return
+        os.makedirs(self.CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(response_data, f)
+        os.replace(tmp_path, cache_path)
+
+    @staticmethod
+    def _normalize_response(image_path: str, status: int,
+                            response_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn a raw API response into a success dict, or raise.
+
+        SM.MS answers duplicates with code "image_repeated" and the
+        existing URL instead of data - treat that as a successful upload
+        so callers get the working link, and let the content cache stop
+        the next resend of the same bytes.
+        """
+        if status == 200 and response_data.get('success') is not False:
+            return response_data
+        if response_data.get('code') == 'image_repeated' and response_data.get('images'):
+            return {
+                'success': True,
+                'code': 'image_repeated',
+                'data': {
+                    'url': response_data['images'],
+                    'filename': os.path.basename(image_path),
+                },
+            }
+        error_msg = response_data.get('message', 'Unknown error')
+        raise Exception(f"Upload failed: {error_msg}")
+
+    def close(self):
+        """Close the underlying HTTP session."""
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def upload_image(self, image_path: str) -> Dict[str, Any]:
         """
         Upload an image to SM.MS.
@@ -37,27 +171,164 @@ class SMmsUploader:
         Returns:
             Response data from the API
         """
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image not found: {image_path}")
-        
+        mime_type = self._validate_image(image_path)
+
+        cache_path = self._cache_path_for(image_path)
+        cached = self._cache_load(cache_path)
+        if cached is not None:
+            return cached
+
         upload_url = f"{self.BASE_URL}/upload"
-        
-        with open(image_path, 'rb') as image_file:
-            files = {'smfile': image_file}
-            response = requests.post(
-                upload_url,
-                files=files,
-                headers=self.headers
-            )
-        
-        response_data = response.json()
-        
-        if response.status_code != 200 or response_data.get('success') is False:
-            error_msg = response_data.get('message', 'Unknown error')
-            raise Exception(f"Upload failed: {error_msg}")
-        
+
+        # Transient statuses are retried here rather than by the adapter:
+        # the streamed MultipartEncoder body isn't seekable, so a retry
+        # has to rebuild the encoder (and reopen the file) per attempt.
+        max_attempts = 5
+        for attempt in range(max_attempts):
+            # MultipartEncoder streams the file from disk with a
+            # precomputed Content-Length, so multi-MB images are never
+            # buffered in memory to build the request body
+            with open(image_path, 'rb') as image_file:
+                encoder = MultipartEncoder(
+                    fields={'smfile': (os.path.basename(image_path), image_file, mime_type)}
+                )
+                # The session already carries Authorization; only the
+                # per-request multipart Content-Type needs passing here
+                response = self.session.post(
+                    upload_url,
+                    data=encoder,
+                    headers={'Content-Type': encoder.content_type},
+                    timeout=self.TIMEOUT
+                )
+            if response.status_code in (429, 500, 502, 503, 504) and attempt < max_attempts - 1:
+                time.sleep(min(30, 2 ** attempt + random.uniform(0, 1)))
+                continue
+            break
+
+
+        # Don't bother parsing non-JSON error bodies (HTML gateway pages,
+        # empty 5xx responses) - fail with the status and a snippet
+        if not response.ok and not response.headers.get(
+                'Content-Type', '').startswith('application/json'):
+            raise Exception(f"Upload failed: HTTP {response.status_code}: {response.text[:200]}")
+
+        # orjson parses the raw bytes in C; response.json() goes through
+        # the stdlib decoder
+        response_data = self._normalize_response(
+            image_path, response.status_code, orjson.loads(response.content)
+        )
+        self._cache_store(cache_path, response_data)
         return response_data
     
+    def upload_images(self, image_paths: List[str]) -> List[Dict[str, Any]]:
+        """
+        Upload several images in one call.
+
+        Args:
+            image_paths: Paths to the image files
+
+        Returns:
+            One result dict per path, in the same order: the API response
+            data on success, or {'path': ..., 'success': False, 'message': ...}
+            when that upload failed. A single bad file does not abort the batch.
+        """
+        results = []
+        for image_path in image_paths:
+            try:
+                results.append(self.upload_image(image_path))
+            except Exception as e:
+                results.append({
+                    'path': image_path,
+                    'success': False,
+                    'message': str(e)
+                })
+        return results
+
+    async def upload_images_async(self, image_paths: List[str], max_concurrent: int = 10,
+                                  max_retries: int = 3) -> List[Dict[str, Any]]:
+        """
+        Upload several images concurrently over one aiohttp session.
+
+        A fixed pool of worker coroutines drains a queue of paths over a
+        shared session, bounding how many uploads are in flight at once;
+        transient failures (429/5xx, connection errors) are retried with
+        exponential backoff plus jitter.
+
+        Args:
+            image_paths: Paths to the image files
+            max_concurrent: Maximum uploads in flight at once
+            max_retries: Attempts per image before recording a failure
+
+        Returns:
+            One result dict per path, in the same order, matching the
+            error convention of the sync upload_images method.
+        """
+        upload_url = f"{self.BASE_URL}/upload"
+
+        async def upload(session, path):
+            # Same preflight and cache as upload_image: invalid files are
+            # reported without a request, repeat content without an upload
+            try:
+                mime_type = self._validate_image(path)
+            except (FileNotFoundError, ValueError) as e:
+                return {'path': path, 'success': False, 'message': str(e)}
+            cache_path = self._cache_path_for(path)
+            cached = self._cache_load(cache_path)
+            if cached is not None:
+                return cached
+
+            last_error = None
+            for attempt in range(max_retries):
+                try:
+                    with open(path, 'rb') as image_file:
+                        form = aiohttp.FormData()
+                        form.add_field('smfile', image_file,
+                                       filename=os.path.basename(path),
+                                       content_type=mime_type)
+                        async with session.post(upload_url, data=form) as response:
+                            if response.status == 429 or response.status >= 500:
+                                last_error = f"HTTP {response.status}"
+                                await asyncio.sleep(min(30, 2 ** attempt + random.uniform(0, 1)))
+                                continue
+                            status = response.status
+                            body = await response.read()
+                    try:
+                        data = self._normalize_response(path, status, orjson.loads(body))
+                    except Exception as e:
+                        # Definitive API rejection - retrying won't help
+                        return {'path': path, 'success': False, 'message': str(e)}
+                    self._cache_store(cache_path, data)
+                    return data
+                except Exception as e:
+                    last_error = str(e)
+                    await asyncio.sleep(min(30, 2 ** attempt + random.uniform(0, 1)))
+            return {'path': path, 'success': False, 'message': str(last_error)}
+
+        # Queue + worker pool: the worker count bounds concurrency and all
+        # workers share one session's connection pool, so adding paths
+        # never opens more sockets than max_concurrent
+        queue = asyncio.Queue()
+        for item in enumerate(image_paths):
+            queue.put_nowait(item)
+        results = [None] * len(image_paths)
+
+        async def worker(session):
+            while True:
+                try:
+                    index, path = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                results[index] = await upload(session, path)
+
+        timeout = aiohttp.ClientTimeout(total=self.TIMEOUT)
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout) as session:
+            workers = [
+                asyncio.create_task(worker(session))
+                for _ in range(min(max_concurrent, len(image_paths)))
+            ]
+            await asyncio.gather(*workers)
+        return results
+
     def get_markdown_link(self, response_data: Dict[str, Any]) -> str:
         """
         Extract the markdown link from the API response.
@@ -79,16 +350,37 @@ class SMmsUploader:
 
 def main():
     parser = argparse.ArgumentParser(description="Upload images to SM.MS and get markdown links")
-    parser.add_argument("image_path", help="Path to the image file to upload")
+    parser.add_argument("image_path", nargs="?", help="Path to the image file to upload")
     parser.add_argument("-t", "--token", help="SM.MS API token (alternatively, set SMMS_TOKEN environment variable)")
-    
+    parser.add_argument("--batch", nargs="+", metavar="PATH",
+                        help="Upload multiple images concurrently")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Always upload, even if an identical file was uploaded before")
+
     args = parser.parse_args()
-    
+
+    if not args.image_path and not args.batch:
+        parser.error("provide an image path or --batch PATH [PATH ...]")
+
+    if args.batch:
+        try:
+            with SMmsUploader(args.token, use_cache=not args.no_cache) as uploader:
+                results = asyncio.run(uploader.upload_images_async(args.batch))
+                for result in results:
+                    if result.get('success') is False:
+                        print(f"Failed: {result.get('path')}: {result.get('message')}")
+                    else:
+                        print(uploader.get_markdown_link(result))
+        except Exception as e:
+            print(f"Error: {e}")
+            return 1
+        return 0
+
     try:
-        uploader = SMmsUploader(args.token)
-        response = uploader.upload_image(args.image_path)
-        markdown_link = uploader.get_markdown_link(response)
-        
+        with SMmsUploader(args.token, use_cache=not args.no_cache) as uploader:
+            response = uploader.upload_image(args.image_path)
+            markdown_link = uploader.get_markdown_link(response)
+
         print("Upload successful!")
         print("\nMarkdown Link:")
         print(markdown_link)
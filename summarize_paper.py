@@ -1,5 +1,10 @@
-from openai import OpenAI
-import json
+from openai import OpenAI, AsyncOpenAI
+import asyncio
+import functools
+import gzip
+import hashlib
+import httpx
+import orjson
 from dotenv import load_dotenv
 import os
 import yaml
@@ -11,55 +16,239 @@ load_dotenv()
 # Get logger for the current module
 logger = get_logger(__name__)
 
+# Summaries cached on disk keyed by prompt config + paper text, so
+# re-running over unchanged input skips the paid API call
+SUMMARY_CACHE_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "pangpang", "summaries"
+)
 
+# Papers longer than this (in characters) are summarized map-reduce
+# style: chunks in parallel, then one reduce call over the partials
+MAP_REDUCE_THRESHOLD = 120_000
+MAP_CHUNK_SIZE = 60_000
+
+
+@functools.lru_cache(maxsize=1)
 def load_config():
     """
-    Load configuration from YAML file with UTF-8 encoding
+    Load configuration from YAML file with UTF-8 encoding.
+    Cached so repeated summaries don't re-parse the file.
     """
     with open("summarize_config.yaml", "r", encoding="utf-8") as f:
-        config = yaml.safe_load(f)
+        # libyaml-backed loader when available; SafeLoader is the pure
+        # Python fallback
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+        config = yaml.load(f, Loader=loader)
     return config
 
 
-def summarize_paper(text):
-    """
-    Summarize the paper using OpenAI API
-    :param text: The original paper text
-    :param model: The model to use (default is gpt-4)
-    :param max_tokens: Maximum number of tokens for the summary
-    :return: Summarized text
+class _GzipRequestTransport(httpx.HTTPTransport):
+    """Gzip large request bodies on the way to the API
+
+    A full paper is hundreds of KB of markdown that compresses 3-10x, so
+    this mostly benefits upload time on slow uplinks. If the server
+    rejects the compressed request (4xx), the original is resent
+    uncompressed so providers without request-body gzip still work.
     """
-    client = OpenAI(
+
+    MIN_COMPRESS_SIZE = 1024
+
+    def handle_request(self, request):
+        body = request.read()
+        if (
+            len(body) >= self.MIN_COMPRESS_SIZE
+            and "content-encoding" not in request.headers
+        ):
+            compressed = gzip.compress(body, compresslevel=6)
+            headers = request.headers.copy()
+            headers["content-encoding"] = "gzip"
+            headers["content-length"] = str(len(compressed))
+            gz_request = httpx.Request(
+                request.method, request.url, headers=headers, content=compressed
+            )
+            response = super().handle_request(gz_request)
+            if response.status_code < 400:
+                return response
+            # Server didn't take the compressed body - fall through and
+            # send the request as-is
+            response.close()
+        return super().handle_request(request)
+
+
+@functools.lru_cache(maxsize=1)
+def _client() -> OpenAI:
+    """One client per process so its HTTP pool survives across calls"""
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url="https://api.deepseek.com",
+        http_client=httpx.Client(transport=_GzipRequestTransport()),
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _async_client() -> AsyncOpenAI:
+    """Async twin of _client, used by the map-reduce path"""
+    return AsyncOpenAI(
         api_key=os.getenv("OPENAI_API_KEY"), base_url="https://api.deepseek.com"
     )
-    config = load_config()
-    response = client.chat.completions.create(
+
+
+def _stream_completion(messages, config, on_delta=None):
+    """Run one streamed chat completion, returning the accumulated text"""
+    response = _client().chat.completions.create(
         model="deepseek-chat",
-        messages=[
+        messages=messages,
+        temperature=config["temperature"],
+        stream=True,
+    )
+    parts = []
+    for chunk in response:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            if on_delta:
+                on_delta(delta)
+    return "".join(parts).strip()
+
+
+async def _summarize_chunks_async(chunks, config, max_concurrent=5):
+    """Map step: summarize every chunk concurrently, bounded by a semaphore"""
+    sem = asyncio.Semaphore(max_concurrent)
+    client = _async_client()
+
+    async def summarize_chunk(index, chunk):
+        async with sem:
+            response = await client.chat.completions.create(
+                model="deepseek-chat",
+                messages=[
+                    {"role": "system", "content": config["system_message"]},
+                    {
+                        "role": "user",
+                        "content": f"This is part {index} of {len(chunks)} of a longer paper. "
+                        f"Summarize this part:\n\n{chunk}",
+                    },
+                ],
+                temperature=config["temperature"],
+            )
+            return response.choices[0].message.content.strip()
+
+    return await asyncio.gather(
+        *(summarize_chunk(i, c) for i, c in enumerate(chunks, 1))
+    )
+
+
+def _map_reduce_summarize(text, config, on_delta=None):
+    """Summarize a long paper in parallel chunks, then reduce the partials
+
+    The map step dominates total time and runs up to five chunk requests
+    concurrently; the reduce is a single (streamed) call over the much
+    shorter partial summaries.
+    """
+    chunks = [
+        text[i : i + MAP_CHUNK_SIZE] for i in range(0, len(text), MAP_CHUNK_SIZE)
+    ]
+    logger.info(
+        f"Paper is {len(text)} chars; map-reduce over {len(chunks)} chunks"
+    )
+    partials = asyncio.run(_summarize_chunks_async(chunks, config))
+
+    combined = "\n\n".join(
+        f"Part {i}:\n{partial}" for i, partial in enumerate(partials, 1)
+    )
+    return _stream_completion(
+        [
             {"role": "system", "content": config["system_message"]},
-            {"role": "user", "content": text},
+            {
+                "role": "user",
+                "content": "Below are summaries of consecutive parts of one paper. "
+                "Combine them into a single coherent summary of the whole "
+                f"paper:\n\n{combined}",
+            },
         ],
-        temperature=config["temperature"],
+        config,
+        on_delta=on_delta,
     )
-    return response.choices[0].message.content.strip()
+
+
+def summarize_paper(text, force=False, on_delta=None):
+    """
+    Summarize the paper using OpenAI API
+    :param text: The original paper text
+    :param force: Bypass the local summary cache and call the API
+    :param on_delta: Optional callable receiving each text fragment as it
+        streams in (called once with the full text on a cache hit)
+    :return: Summarized text
+    """
+    config = load_config()
+
+    # Cache key covers everything that shapes the output: prompt,
+    # temperature and the paper text itself
+    key = hashlib.sha256(
+        (config["system_message"] + str(config["temperature"]) + text).encode("utf-8")
+    ).hexdigest()
+    cache_path = os.path.join(SUMMARY_CACHE_DIR, f"{key}.txt")
+
+    if not force and os.path.exists(cache_path):
+        logger.info("Using cached summary")
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = f.read()
+        if on_delta:
+            on_delta(cached)
+        return cached
+
+    if len(text) > MAP_REDUCE_THRESHOLD:
+        summary = _map_reduce_summarize(text, config, on_delta=on_delta)
+    else:
+        # Stream the completion: consumers see tokens at first-token
+        # latency instead of waiting for the whole response server-side
+        summary = _stream_completion(
+            [
+                {"role": "system", "content": config["system_message"]},
+                {"role": "user", "content": text},
+            ],
+            config,
+            on_delta=on_delta,
+        )
+
+    os.makedirs(SUMMARY_CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(summary)
+    os.replace(tmp_path, cache_path)
+
+    return summary
 
 
 if __name__ == "__main__":
-    with open("result.json") as f:
-        data = json.load(f)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize result.json with DeepSeek")
+    parser.add_argument(
+        "--force", action="store_true", help="Bypass the local summary cache"
+    )
+    args = parser.parse_args()
+
+    # orjson parses the (often multi-MB) OCR JSON in C from raw bytes
+    with open("result.json", "rb") as f:
+        data = orjson.loads(f.read())
         pages_info = data["pages"]
 
-        content = ""
-        for page in pages_info:
-            content += page["md"]
-        paper_text = content
+        # One join allocates the final buffer once instead of recopying
+        # the accumulated text for every page
+        paper_text = "".join(page["md"] for page in pages_info)
+
+        # Write each fragment as it streams in, so the summary file fills
+        # while tokens are still being generated
+        date = datetime.now().strftime("%Y-%m-%d")
+        with open(f"summary_{date}.md", "w", encoding="utf-8") as f:
+
+            def _write_delta(delta):
+                f.write(delta)
+                f.flush()
 
-        # Call the summarize function
-        summary = summarize_paper(paper_text)
+            summary = summarize_paper(
+                paper_text, force=args.force, on_delta=_write_delta
+            )
 
         logger.info("Speed Reading Brief:")
         logger.info(summary)
-
-        date = datetime.now().strftime("%Y-%m-%d")
-        with open(f"summary_{date}.md", "w") as f:
-            f.write(summary)